@@ -0,0 +1,105 @@
+"""Streaks and heatmaps from the per-user activity bitmaps.
+
+Each :class:`models.ActivityYear` row packs one bit per day of a year. The
+years in a date range are concatenated into a single Python int (bit ``i``
+is ``start + i days``) so streaks and counts are plain integer bit
+operations rather than per-day loops.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app import db
+from models import ActivityYear, LearningSession, Progress
+
+
+def load_bitmap(user_id, start, end):
+    """Bitset of active days in ``[start, end]``; bit 0 is ``start``."""
+    rows = db.session.execute(select(ActivityYear.year, ActivityYear.days).where(
+        ActivityYear.user_id == user_id,
+        ActivityYear.year >= start.year,
+        ActivityYear.year <= end.year,
+    )).all()
+    origin = date(start.year, 1, 1)
+    bits = 0
+    for year, days in rows:
+        bits |= int.from_bytes(days, 'little') << (date(year, 1, 1) - origin).days
+    bits >>= (start - origin).days
+    return bits & ((1 << ((end - start).days + 1)) - 1)
+
+
+def trailing_run(bits, length):
+    """Length of the run of set bits ending at bit ``length - 1``."""
+    gaps = ~bits & ((1 << length) - 1)
+    return length - gaps.bit_length()
+
+
+def longest_run(bits):
+    # Each step clears the last bit of every run, so the step count is the
+    # length of the longest run.
+    longest = 0
+    while bits:
+        bits &= bits >> 1
+        longest += 1
+    return longest
+
+
+def _history(user_id, today, start=None):
+    """All recorded activity up to ``today`` as ``(bits, origin)``."""
+    first_year = db.session.execute(
+        select(func.min(ActivityYear.year)).where(ActivityYear.user_id == user_id)
+    ).scalar()
+    origin = date(min(first_year or today.year, (start or today).year), 1, 1)
+    return load_bitmap(user_id, origin, today), origin
+
+
+def _current_run(history, length):
+    # A streak is still alive until a full day has been missed
+    return trailing_run(history, length) or trailing_run(history, length - 1)
+
+
+def current_streak(user_id, today=None):
+    today = today or datetime.utcnow().date()
+    history, origin = _history(user_id, today)
+    return _current_run(history, (today - origin).days + 1)
+
+
+def activity_summary(user_id, today=None, days=365):
+    today = today or datetime.utcnow().date()
+    start = today - timedelta(days=days - 1)
+    history, origin = _history(user_id, today, start)
+
+    bits = history >> (start - origin).days
+    return {
+        'start': start.isoformat(),
+        'end': today.isoformat(),
+        'heatmap': format(bits, '0%db' % days)[::-1],
+        'active_days': bin(bits).count('1'),
+        'current_streak': _current_run(history, (today - origin).days + 1),
+        'longest_streak': longest_run(history),
+    }
+
+
+def backfill_from_sessions(user_id=None):
+    """Mark every day that has a learning session; returns rows touched."""
+    statement = select(LearningSession.user_id, func.date(LearningSession.started_at)).distinct()
+    if user_id is not None:
+        statement = statement.where(LearningSession.user_id == user_id)
+
+    years = defaultdict(int)
+    for session_user_id, day in db.session.execute(statement):
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        years[(session_user_id, day.year)] |= 1 << (day.timetuple().tm_yday - 1)
+
+    for (session_user_id, year), bits in years.items():
+        ActivityYear.get_or_create(session_user_id, year).set_bits(bits)
+
+    # Keep the stored streak in line with the backfilled bitmaps
+    for session_user_id in {key[0] for key in years}:
+        progress = Progress.query.filter_by(user_id=session_user_id).first()
+        if progress:
+            progress.streak_days = current_streak(session_user_id)
+    db.session.commit()
+    return len(years)
@@ -1,8 +1,10 @@
 import os
+import tempfile
 from flask import Flask, render_template, send_from_directory, request, jsonify, session, redirect, url_for
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
+from ratelimit import rate_limit
 from datetime import datetime, timedelta
 import json
 
@@ -14,7 +16,7 @@ db = SQLAlchemy(model_class=Base)
 # Create the Flask app
 app = Flask(__name__, static_folder='.', static_url_path='')
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key")
-app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)
 
 # Configure the database
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL")
@@ -24,6 +26,13 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
 }
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+# Rate limiting and load shedding for write endpoints (shared by all workers)
+app.config["RATELIMIT_STORAGE"] = os.environ.get(
+    "RATELIMIT_STORAGE", os.path.join(tempfile.gettempdir(), "vlsihero-ratelimit")
+)
+app.config["MAX_CONCURRENT_WRITES"] = int(os.environ.get("MAX_CONCURRENT_WRITES", 12))
+app.config["MAX_POOL_CHECKOUT_WAIT"] = float(os.environ.get("MAX_POOL_CHECKOUT_WAIT", 0.25))
+
 # Initialize the app with the extension
 db.init_app(app)
 
@@ -62,8 +71,19 @@ def get_current_user():
         db.session.commit()
     return user
 
+# Helper to attach static timing to a circuit's simulation results
+def run_timing_analysis(design_data, clock_period=None, previous=None):
+    from timing import analyze_design
+    
+    try:
+        return analyze_design(design_data, clock_period, previous)
+    except ValueError as e:
+        # Partially drawn circuits are saved too; report why timing is missing
+        return {"error": str(e)}
+
 # API endpoints for progress tracking
 @app.route('/api/progress', methods=['GET', 'POST'])
+@rate_limit(capacity=60, period=60)
 def api_progress():
     from models import Progress, LearningSession
     
@@ -112,6 +132,7 @@ def api_progress():
         return jsonify(progress.to_dict())
 
 @app.route('/api/quiz/submit', methods=['POST'])
+@rate_limit(capacity=10, period=60)
 def submit_quiz():
     from models import QuizAttempt, Progress, Achievement
     
@@ -197,33 +218,29 @@ def submit_quiz():
 
 @app.route('/api/achievements')
 def api_achievements():
-    from models import Achievement
+    from serializers import achievement_rows, json_response
     
     user = get_current_user()
-    achievements = Achievement.query.filter_by(user_id=user.id).all()
     
-    return jsonify({
-        "achievements": [achievement.to_dict() for achievement in achievements]
+    return json_response({
+        "achievements": achievement_rows(user.id)
     })
 
 @app.route('/api/learning-sessions')
 def api_learning_sessions():
-    from models import LearningSession
+    from serializers import learning_session_rows, json_response
     
     user = get_current_user()
     
     # Get recent sessions (last 30 days)
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    sessions = LearningSession.query.filter(
-        LearningSession.user_id == user.id,
-        LearningSession.started_at >= thirty_days_ago
-    ).order_by(LearningSession.started_at.desc()).all()
     
-    return jsonify({
-        "sessions": [session.to_dict() for session in sessions]
+    return json_response({
+        "sessions": learning_session_rows(user.id, thirty_days_ago)
     })
 
 @app.route('/api/circuit-designs', methods=['GET', 'POST'])
+@rate_limit(capacity=30, period=60)
 def api_circuit_designs():
     from models import CircuitDesign
     
@@ -240,8 +257,15 @@ def api_circuit_designs():
         )
         circuit.set_design_data(data.get('design_data', {}))
         
-        if 'simulation_results' in data:
-            circuit.set_simulation_results(data['simulation_results'])
+        simulation_results = data.get('simulation_results', {})
+        if isinstance(simulation_results, dict):
+            # Timing is always computed server-side, never taken from the client
+            simulation_results.pop('timing', None)
+            timing = run_timing_analysis(data.get('design_data', {}), data.get('clock_period'))
+            if timing is not None:
+                simulation_results['timing'] = timing
+        if simulation_results:
+            circuit.set_simulation_results(simulation_results)
         
         db.session.add(circuit)
         db.session.commit()
@@ -252,31 +276,119 @@ def api_circuit_designs():
         })
     
     else:
-        circuits = CircuitDesign.query.filter_by(user_id=user.id).order_by(
-            CircuitDesign.updated_at.desc()
-        ).all()
+        from serializers import circuit_design_rows, json_response
         
-        return jsonify({
-            "circuits": [circuit.to_dict() for circuit in circuits]
+        # Stored design/simulation JSON is spliced into the response as-is
+        return json_response({
+            "circuits": circuit_design_rows(user.id)
         })
 
+@app.route('/api/circuit-designs/<int:circuit_id>', methods=['PUT'])
+@rate_limit(capacity=30, period=60, methods=('PUT',))
+def api_update_circuit_design(circuit_id):
+    from models import CircuitDesign
+    
+    user = get_current_user()
+    circuit = CircuitDesign.query.filter_by(id=circuit_id, user_id=user.id).first_or_404()
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"status": "error", "message": "Request body must be a JSON object"}), 400
+    
+    for field in ('name', 'description', 'is_public'):
+        if field in data:
+            setattr(circuit, field, data[field])
+    
+    simulation_results = circuit.get_simulation_results()
+    if not isinstance(simulation_results, dict):
+        simulation_results = {}
+    
+    # The stored analysis is the only trusted baseline for incremental re-timing
+    previous_timing = simulation_results.pop('timing', None)
+    if isinstance(data.get('simulation_results'), dict):
+        simulation_results.update(data['simulation_results'])
+        simulation_results.pop('timing', None)
+    
+    stored_period = previous_timing.get('clock_period') if isinstance(previous_timing, dict) else None
+    clock_period = data.get('clock_period', stored_period)
+    
+    if 'design_data' in data or clock_period != stored_period:
+        # Re-time only the fan-out cone of the edited gates using the stored analysis
+        design_data = data.get('design_data', circuit.get_design_data())
+        previous = (circuit.get_design_data(), previous_timing) if previous_timing else None
+        timing = run_timing_analysis(design_data, clock_period, previous)
+        circuit.set_design_data(design_data)
+    else:
+        timing = previous_timing
+    if timing is not None:
+        simulation_results['timing'] = timing
+    
+    circuit.set_simulation_results(simulation_results)
+    db.session.commit()
+    
+    return jsonify({
+        "status": "success",
+        "circuit": circuit.to_dict()
+    })
+
+@app.route('/api/logic/minimize', methods=['POST'])
+@rate_limit(capacity=20, period=60)
+def api_logic_minimize():
+    from models import CircuitDesign
+    from minimizer import minimize_truth_table, minimize_design
+    
+    user = get_current_user()
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"status": "error", "message": "Request body must be a JSON object"}), 400
+    
+    try:
+        if 'truth_table' in data:
+            result = minimize_truth_table(data['truth_table'])
+        elif 'circuit_id' in data:
+            if isinstance(data['circuit_id'], bool) or not isinstance(data['circuit_id'], int):
+                raise ValueError("'circuit_id' must be an integer")
+            circuit = CircuitDesign.query.filter_by(
+                id=data['circuit_id'], user_id=user.id
+            ).first_or_404()
+            result = minimize_design(circuit.get_design_data())
+        else:
+            result = minimize_design(data.get('design_data', {}))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    
+    return jsonify({"status": "success", **result})
+
+@app.route('/api/activity/heatmap')
+def api_activity_heatmap():
+    from activity import activity_summary
+    
+    user = get_current_user()
+    days = min(max(request.args.get('days', 365, type=int), 1), 366)
+    
+    return jsonify(activity_summary(user.id, days=days))
+
+@app.cli.command('backfill-activity')
+def backfill_activity_command():
+    """Populate activity bitmaps from existing learning sessions."""
+    from activity import backfill_from_sessions
+    
+    updated = backfill_from_sessions()
+    print(f"Backfilled {updated} activity year(s)")
+
 @app.route('/api/dashboard-stats')
 def api_dashboard_stats():
-    from models import Progress, QuizAttempt, LearningSession, Achievement
+    from models import Achievement
+    from serializers import quiz_summary, activity_rows, json_response
     
     user = get_current_user()
     progress = user.get_or_create_progress()
     
     # Get quiz stats
-    quiz_attempts = QuizAttempt.query.filter_by(user_id=user.id).all()
-    best_score = max([attempt.get_percentage() for attempt in quiz_attempts]) if quiz_attempts else 0
+    total_attempts, best_score = quiz_summary(user.id)
     
     # Get recent activity (last 7 days)
     week_ago = datetime.utcnow() - timedelta(days=7)
-    recent_sessions = LearningSession.query.filter(
-        LearningSession.user_id == user.id,
-        LearningSession.started_at >= week_ago
-    ).all()
+    recent_sessions = activity_rows(user.id, week_ago)
     
     # Calculate daily activity for chart
     daily_activity = {}
@@ -284,18 +396,18 @@ def api_dashboard_stats():
         date = (datetime.utcnow() - timedelta(days=i)).date()
         daily_activity[date.isoformat()] = 0
     
-    for session in recent_sessions:
-        date_key = session.started_at.date().isoformat()
+    for started_at, xp_earned in recent_sessions:
+        date_key = started_at.date().isoformat()
         if date_key in daily_activity:
-            daily_activity[date_key] += session.xp_earned
+            daily_activity[date_key] += xp_earned
     
     # Get achievements count
     achievements_count = Achievement.query.filter_by(user_id=user.id).count()
     
-    return jsonify({
+    return json_response({
         "progress": progress.to_dict(),
         "quiz_stats": {
-            "total_attempts": len(quiz_attempts),
+            "total_attempts": total_attempts,
             "average_score": progress.average_score,
             "best_score": best_score
         },
@@ -0,0 +1,111 @@
+"""Compare ORM ``to_dict()`` + ``jsonify`` with the column-tuple fast path.
+
+Seeds a throwaway SQLite database with a large number of circuit designs
+and learning sessions, then times both serialization paths:
+
+    python benchmarks/bench_serialization.py [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + DB_PATH
+
+from flask import jsonify  # noqa: E402
+
+from app import app, db  # noqa: E402
+
+
+def seed(rows):
+    from models import User, CircuitDesign, LearningSession
+
+    user = User(username='bench_user', email='bench@vlsihero.com')
+    user.set_password('bench')
+    db.session.add(user)
+    db.session.commit()
+
+    design = {
+        'components': [
+            {'id': i, 'type': 'nand', 'x': i * 20, 'y': 40, 'inputs': [i - 1, i - 2]}
+            for i in range(2, 40)
+        ],
+        'connections': [],
+    }
+    now = datetime.utcnow()
+    for i in range(rows):
+        circuit = CircuitDesign(user_id=user.id, name='Circuit %d' % i, description='Benchmark design')
+        circuit.set_design_data(design)
+        circuit.set_simulation_results({'critical_delay': 412.0, 'worst_slack': 0.0})
+        db.session.add(circuit)
+        session = LearningSession(
+            user_id=user.id,
+            module_id='digital_design',
+            module_name='Digital Design',
+            lesson_id='kmaps',
+            lesson_name='Karnaugh Maps',
+            session_type='lesson',
+            started_at=now - timedelta(minutes=i % 1000),
+        )
+        session.complete_session(50)
+        db.session.add(session)
+    db.session.commit()
+    return user.id
+
+
+def best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    with app.app_context(), app.test_request_context():
+        from models import CircuitDesign, LearningSession
+        from serializers import RawJSON, circuit_design_rows, learning_session_rows, json_response, raw_json
+
+        db.create_all()
+        user_id = seed(rows)
+        since = datetime.utcnow() - timedelta(days=30)
+
+        def orm_circuits():
+            circuits = CircuitDesign.query.filter_by(user_id=user_id).order_by(
+                CircuitDesign.updated_at.desc()
+            ).all()
+            return jsonify({"circuits": [circuit.to_dict() for circuit in circuits]}).get_data()
+
+        def fast_circuits():
+            return json_response({"circuits": circuit_design_rows(user_id)}).get_data()
+
+        def orm_sessions():
+            sessions = LearningSession.query.filter(
+                LearningSession.user_id == user_id,
+                LearningSession.started_at >= since
+            ).order_by(LearningSession.started_at.desc()).all()
+            return jsonify({"sessions": [session.to_dict() for session in sessions]}).get_data()
+
+        def fast_sessions():
+            return json_response({"sessions": learning_session_rows(user_id, since)}).get_data()
+
+        # orjson is only used when it supports Fragment (>= 3.9)
+        print("rows: %d, encoder: %s" % (rows, 'stdlib' if raw_json is RawJSON else 'orjson'))
+        for name, orm_path, fast_path in (
+            ('circuit-designs', orm_circuits, fast_circuits),
+            ('learning-sessions', orm_sessions, fast_sessions),
+        ):
+            orm_time = best_of(orm_path)
+            fast_time = best_of(fast_path)
+            print("%-18s orm %8.1f ms   fast %8.1f ms   %5.1fx" % (
+                name, orm_time * 1000, fast_time * 1000, orm_time / fast_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+"""Two-level boolean minimization for the Digital Design module.
+
+Functions are handled as bitsets: ``on`` and ``dc`` are Python ints with one
+bit per truth-table row. Small functions are solved with Quine-McCluskey;
+wider ones fall back to an Espresso-style EXPAND/IRREDUNDANT heuristic.
+Results for functions of up to ``QM_MAX_INPUTS`` inputs are memoized on
+``(num_inputs, on, dc)``; wider results can run to hundreds of kilobytes
+each and are recomputed instead.
+"""
+from functools import lru_cache
+
+from netlist import Netlist, variable_pattern
+
+QM_MAX_INPUTS = 10
+MAX_INPUTS = 16
+# A 10-input cover is at most 512 cubes (~60 KB), so the cache stays ~30 MB
+CACHE_SIZE = 512
+
+
+def _iter_bits(bits):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+@lru_cache(maxsize=32)
+def _patterns(num_inputs):
+    return tuple(variable_pattern(num_inputs, i) for i in range(num_inputs))
+
+
+def _cube_rows(num_inputs, value, mask):
+    """Bitset of the rows covered by a cube (``mask`` marks the fixed literals)."""
+    full = (1 << (1 << num_inputs)) - 1
+    rows = full
+    for i, pattern in enumerate(_patterns(num_inputs)):
+        bit = 1 << (num_inputs - 1 - i)
+        if mask & bit:
+            rows &= pattern if value & bit else ~pattern & full
+    return rows
+
+
+def _literal_count(cube):
+    return bin(cube[1]).count('1')
+
+
+def _prime_implicants(num_inputs, care):
+    full_mask = (1 << num_inputs) - 1
+    current = {(minterm, full_mask) for minterm in _iter_bits(care)}
+    primes = set()
+    while current:
+        merged = set()
+        combined = set()
+        for value, mask in current:
+            for bit in _iter_bits(mask & ~value):
+                partner = (value | (1 << bit), mask)
+                if partner in current:
+                    combined.add((value, mask & ~(1 << bit)))
+                    merged.add((value, mask))
+                    merged.add(partner)
+        primes |= current - merged
+        current = combined
+    return primes
+
+
+def _quine_mccluskey(num_inputs, on, dc):
+    primes = sorted(_prime_implicants(num_inputs, on | dc), key=lambda c: (_literal_count(c), c))
+    rows = {cube: _cube_rows(num_inputs, *cube) & on for cube in primes}
+    primes = [cube for cube in primes if rows[cube]]
+
+    chosen = []
+    remaining = on
+    for minterm in _iter_bits(on):
+        covering = [cube for cube in primes if rows[cube] >> minterm & 1]
+        if len(covering) == 1 and covering[0] not in chosen:
+            chosen.append(covering[0])
+            remaining &= ~rows[covering[0]]
+
+    # Greedy set cover for whatever the essential primes leave uncovered.
+    while remaining:
+        best = max(primes, key=lambda c: (bin(rows[c] & remaining).count('1'), -_literal_count(c)))
+        chosen.append(best)
+        remaining &= ~rows[best]
+    return chosen
+
+
+def _espresso(num_inputs, on, dc):
+    full = (1 << (1 << num_inputs)) - 1
+    off = full & ~(on | dc)
+
+    cover = []
+    remaining = on
+    while remaining:
+        value = (remaining & -remaining).bit_length() - 1
+        mask = (1 << num_inputs) - 1
+        cube_rows = 1 << value
+        # EXPAND: raise literals as long as the cube stays clear of the OFF-set.
+        # Raising literal ``bit`` mirrors the cube's rows across that bit of the
+        # row number, which is a single shift of the row bitset.
+        for bit in range(num_inputs - 1, -1, -1):
+            stride = 1 << bit
+            if value & stride:
+                candidate = cube_rows | (cube_rows >> stride)
+            else:
+                candidate = cube_rows | (cube_rows << stride)
+            if not candidate & off:
+                cube_rows = candidate
+                mask &= ~stride
+        cube = (value & mask, mask)
+        cover.append(cube)
+        remaining &= ~cube_rows
+
+    # IRREDUNDANT: drop cubes whose ON-set rows are covered by the others,
+    # tracking how many cubes cover each ON row.
+    is_on = format(on, '0%db' % (1 << num_inputs))[::-1]
+    counts = [0] * (1 << num_inputs)
+    members = {}
+    for cube in cover:
+        members[cube] = [row for row in _cube_minterms(num_inputs, *cube) if is_on[row] == '1']
+        for row in members[cube]:
+            counts[row] += 1
+    for cube in sorted(cover, key=lambda c: (len(members[c]), c)):
+        if all(counts[row] > 1 for row in members[cube]):
+            cover.remove(cube)
+            for row in members[cube]:
+                counts[row] -= 1
+    return cover
+
+
+def _cube_minterms(num_inputs, value, mask):
+    free = ~mask & ((1 << num_inputs) - 1)
+    subset = free
+    while True:
+        yield value | subset
+        if not subset:
+            return
+        subset = (subset - 1) & free
+
+
+def minimize(num_inputs, on, dc=0):
+    """Minimal sum-of-products cover as a tuple of ``(value, mask)`` cubes."""
+    if num_inputs > MAX_INPUTS:
+        raise ValueError("At most %d inputs are supported" % MAX_INPUTS)
+    if num_inputs <= QM_MAX_INPUTS:
+        return _minimize_cached(num_inputs, on, dc)
+    return _minimize(num_inputs, on, dc)
+
+
+def _minimize(num_inputs, on, dc):
+    full = (1 << (1 << num_inputs)) - 1
+    on &= full
+    dc &= full & ~on
+    if not on:
+        return ()
+    if not full & ~(on | dc):
+        return ((0, 0),)
+    if num_inputs <= QM_MAX_INPUTS:
+        cover = _quine_mccluskey(num_inputs, on, dc)
+    else:
+        cover = _espresso(num_inputs, on, dc)
+    return tuple(sorted(cover, key=lambda c: (-c[1], c[0])))
+
+
+_minimize_cached = lru_cache(maxsize=CACHE_SIZE)(_minimize)
+
+
+def format_sop(cubes, names):
+    if not cubes:
+        return '0'
+    num_inputs = len(names)
+    terms = []
+    for value, mask in cubes:
+        literals = []
+        for i, name in enumerate(names):
+            bit = 1 << (num_inputs - 1 - i)
+            if mask & bit:
+                literals.append(name if value & bit else name + "'")
+        terms.append(''.join(literals) if literals else '1')
+    return ' + '.join(terms)
+
+
+def sop_gate_count(covers, num_inputs):
+    """Gates needed to build each cover as a two-level AND-OR network."""
+    inverted = set()
+    gates = 0
+    for cubes in covers:
+        for value, mask in cubes:
+            if _literal_count((value, mask)) > 1:
+                gates += 1
+            inverted |= set(_iter_bits(mask & ~value))
+        if len(cubes) > 1:
+            gates += 1
+    return gates + len(inverted)
+
+
+def _row_list(data, key):
+    rows = data.get(key, [])
+    if not isinstance(rows, list):
+        raise ValueError("'%s' must be a list" % key)
+    for row in rows:
+        if isinstance(row, bool) or not isinstance(row, int):
+            raise ValueError("Invalid row number in '%s': %r" % (key, row))
+    return rows
+
+
+def parse_truth_table(data):
+    """Return ``(input_names, on, dc)`` from a truth-table payload.
+
+    Accepts ``minterms``/``dont_cares`` index lists or an ``outputs`` column
+    of ``0``/``1``/``'x'`` values, plus optional ``inputs`` variable names.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Truth table must be an object")
+    names = data.get('inputs')
+    if names is not None and (
+            not isinstance(names, list) or not all(isinstance(name, str) for name in names)):
+        raise ValueError("'inputs' must be a list of names")
+    if 'outputs' in data:
+        outputs = data['outputs']
+        if not isinstance(outputs, list):
+            raise ValueError("'outputs' must be a list")
+        if len(outputs) > 1 << MAX_INPUTS:
+            raise ValueError("At most %d inputs are supported" % MAX_INPUTS)
+        num_inputs = max(len(outputs) - 1, 0).bit_length()
+        if len(outputs) != 1 << num_inputs:
+            raise ValueError("Truth table must have a power-of-two number of rows")
+        on = dc = 0
+        for row, output in enumerate(outputs):
+            if output in (1, '1', True):
+                on |= 1 << row
+            elif str(output).lower() in ('x', '-', 'd'):
+                dc |= 1 << row
+            elif output not in (0, '0', False):
+                raise ValueError("Invalid truth-table value: %r" % (output,))
+    else:
+        minterms = _row_list(data, 'minterms')
+        dont_cares = _row_list(data, 'dont_cares')
+        num_inputs = len(names) if names else max(max(minterms + dont_cares, default=0), 1).bit_length()
+        # Range-check before shifting so huge row numbers never allocate
+        limit = 1 << min(num_inputs, MAX_INPUTS)
+        for row in minterms + dont_cares:
+            if not 0 <= row < limit:
+                raise ValueError("Minterm %d out of range for %d inputs" % (row, num_inputs))
+        on = dc = 0
+        for row in minterms:
+            on |= 1 << row
+        for row in dont_cares:
+            dc |= 1 << row
+
+    if names is None:
+        names = [chr(ord('A') + i) for i in range(num_inputs)]
+    if len(names) != num_inputs:
+        raise ValueError("Expected %d input names, got %d" % (num_inputs, len(names)))
+    if num_inputs > MAX_INPUTS:
+        raise ValueError("At most %d inputs are supported" % MAX_INPUTS)
+    return list(names), on, dc
+
+
+def _output_result(name, cubes, input_names):
+    return {
+        'name': name,
+        'sop': format_sop(cubes, input_names),
+        'terms': len(cubes),
+        'literals': sum(_literal_count(cube) for cube in cubes),
+    }
+
+
+def minimize_truth_table(data):
+    names, on, dc = parse_truth_table(data)
+    output_name = data.get('output', 'F')
+    if not isinstance(output_name, str):
+        raise ValueError("'output' must be a name")
+    cubes = minimize(len(names), on, dc)
+    return {
+        'inputs': names,
+        'outputs': [_output_result(output_name, cubes, names)],
+        'gate_count': {
+            'original': None,
+            'minimized': sop_gate_count([cubes], len(names)),
+        },
+        'method': 'quine-mccluskey' if len(names) <= QM_MAX_INPUTS else 'espresso',
+    }
+
+
+def minimize_design(design_data):
+    netlist = Netlist.from_design_data(design_data)
+    names = netlist.input_names()
+    if len(names) > MAX_INPUTS:
+        raise ValueError("At most %d inputs are supported" % MAX_INPUTS)
+    if not netlist.outputs:
+        raise ValueError("Circuit has no outputs")
+    covers = []
+    outputs = []
+    for output_name, on in netlist.truth_tables().items():
+        cubes = minimize(len(names), on)
+        covers.append(cubes)
+        outputs.append(_output_result(output_name, cubes, names))
+    original = netlist.gate_count()
+    minimized = sop_gate_count(covers, len(names))
+    return {
+        'inputs': names,
+        'outputs': outputs,
+        'gate_count': {
+            'original': original,
+            'minimized': minimized,
+            'is_minimal': original <= minimized,
+        },
+        'method': 'quine-mccluskey' if len(names) <= QM_MAX_INPUTS else 'espresso',
+    }
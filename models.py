@@ -1,6 +1,7 @@
 from app import db
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.exc import IntegrityError
 import json
 
 class User(db.Model):
@@ -85,21 +86,13 @@ class Progress(db.Model):
         return min(100, (self.modules_completed / self.total_modules) * 100)
     
     def update_streak(self):
-        today = datetime.utcnow().date()
-        if self.last_active_date:
-            days_diff = (today - self.last_active_date).days
-            if days_diff == 1:
-                # Consecutive day
-                self.streak_days += 1
-            elif days_diff > 1:
-                # Streak broken
-                self.streak_days = 1
-            # If days_diff == 0, same day, no change
-        else:
-            # First time
-            self.streak_days = 1
+        from activity import current_streak
         
+        today = datetime.utcnow().date()
         self.last_active_date = today
+        ActivityYear.mark(self.user_id, today)
+        # The activity bitmap is the single source of truth for streaks
+        self.streak_days = current_streak(self.user_id, today)
     
     def to_dict(self):
         return {
@@ -255,4 +248,50 @@ class CircuitDesign(db.Model):
             'simulation_results': self.get_simulation_results(),
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+class ActivityYear(db.Model):
+    __tablename__ = 'activity_years'
+    __table_args__ = (db.UniqueConstraint('user_id', 'year'),)
+    
+    BITMAP_BYTES = 46  # one bit per day, 366 days
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    year = db.Column(db.Integer, nullable=False)
+    days = db.Column(db.LargeBinary(BITMAP_BYTES), nullable=False)
+    
+    @classmethod
+    def find(cls, user_id, year):
+        return cls.query.filter_by(user_id=user_id, year=year).with_for_update().first()
+    
+    @classmethod
+    def get_or_create(cls, user_id, year):
+        row = cls.find(user_id, year)
+        if not row:
+            try:
+                # A concurrent first write for the same year only rolls back
+                # this savepoint, not the caller's transaction
+                with db.session.begin_nested():
+                    row = cls(user_id=user_id, year=year, days=bytes(cls.BITMAP_BYTES))
+                    db.session.add(row)
+            except IntegrityError:
+                row = cls.find(user_id, year)
+        return row
+    
+    @classmethod
+    def mark(cls, user_id, day):
+        # Written in the caller's transaction, alongside the streak update
+        row = cls.get_or_create(user_id, day.year)
+        row.set_bits(1 << (day.timetuple().tm_yday - 1))
+        return row
+    
+    def get_bits(self):
+        return int.from_bytes(self.days, 'little') if self.days else 0
+    
+    def set_bits(self, bits):
+        bits |= self.get_bits()
+        self.days = bits.to_bytes(self.BITMAP_BYTES, 'little')
+    
+    def is_active(self, day):
+        return bool(self.get_bits() >> (day.timetuple().tm_yday - 1) & 1)
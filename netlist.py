@@ -0,0 +1,172 @@
+"""Gate-level view of a saved circuit's ``design_data``.
+
+The circuit simulator stores designs as a list of ``components`` plus a list
+of ``connections``. Logic components carry a ``type`` (``input``, ``output``,
+``and``, ``or``, ``not``, ...) and their fan-in is given either by an
+``inputs`` list of component ids on the component itself or by top-level
+connections of the form ``{"from": <id>, "to": <id>}``.
+"""
+import math
+from collections import deque
+
+INPUT_TYPES = ('input', 'switch', 'clock')
+OUTPUT_TYPES = ('output', 'led', 'probe')
+
+# Evaluators work on Python ints used as bitsets, one bit per truth-table row,
+# so a whole truth table is simulated in a single pass over the gates.
+GATE_TYPES = {
+    'buffer': lambda ins, full: ins[0],
+    'not': lambda ins, full: ~ins[0] & full,
+    'and': lambda ins, full: _fold(ins, lambda a, b: a & b),
+    'or': lambda ins, full: _fold(ins, lambda a, b: a | b),
+    'xor': lambda ins, full: _fold(ins, lambda a, b: a ^ b),
+    'nand': lambda ins, full: ~_fold(ins, lambda a, b: a & b) & full,
+    'nor': lambda ins, full: ~_fold(ins, lambda a, b: a | b) & full,
+    'xnor': lambda ins, full: ~_fold(ins, lambda a, b: a ^ b) & full,
+}
+
+
+def _fold(values, op):
+    result = values[0]
+    for value in values[1:]:
+        result = op(result, value)
+    return result
+
+
+def _endpoint_id(endpoint):
+    if isinstance(endpoint, dict):
+        endpoint = endpoint.get('id', endpoint.get('component'))
+    return str(endpoint) if endpoint is not None else None
+
+
+def _parse_delay(delay, name):
+    if delay is None:
+        return None
+    if isinstance(delay, bool) or not isinstance(delay, (int, float)) or not math.isfinite(delay) or delay < 0:
+        raise ValueError("Delay of %s must be a non-negative number" % name)
+    return float(delay)
+
+
+def variable_pattern(num_inputs, index):
+    """Bitset over all ``2**num_inputs`` rows where input ``index`` is 1.
+
+    Input 0 is the most significant bit of the row number, matching the
+    usual textbook truth-table ordering.
+    """
+    rows = 1 << num_inputs
+    half = 1 << (num_inputs - 1 - index)
+    period = half << 1
+    block = ((1 << half) - 1) << half
+    return block * (((1 << rows) - 1) // ((1 << period) - 1))
+
+
+class Gate:
+    __slots__ = ('id', 'type', 'name', 'fanin', 'delay')
+
+    def __init__(self, gate_id, gate_type, name, fanin, delay=None):
+        self.id = gate_id
+        self.type = gate_type
+        self.name = name
+        self.fanin = fanin
+        self.delay = delay
+
+
+class Netlist:
+    def __init__(self, gates):
+        self.gates = gates
+        self.inputs = [g.id for g in gates.values() if g.type in INPUT_TYPES]
+        self.outputs = [g.id for g in gates.values() if g.type in OUTPUT_TYPES]
+        self.fanout = {gate_id: [] for gate_id in gates}
+        for gate in gates.values():
+            for source in gate.fanin:
+                self.fanout[source].append(gate.id)
+        self._order = None
+
+    @classmethod
+    def from_design_data(cls, data):
+        if not isinstance(data, dict):
+            return cls({})
+        components = data.get('components', [])
+        connections = data.get('connections', [])
+        if not isinstance(components, list) or not isinstance(connections, list):
+            raise ValueError("Design components and connections must be lists")
+
+        gates = {}
+        for component in components:
+            if not isinstance(component, dict):
+                raise ValueError("Each component must be an object")
+            gate_type = str(component.get('type', '')).lower()
+            if gate_type not in GATE_TYPES and gate_type not in INPUT_TYPES + OUTPUT_TYPES:
+                continue
+            gate_id = _endpoint_id(component.get('id'))
+            if gate_id is None:
+                raise ValueError("Component is missing an id")
+            name = component.get('label') or component.get('name') or '%s%s' % (gate_type, gate_id)
+            inputs = component.get('inputs', [])
+            if not isinstance(inputs, list):
+                raise ValueError("Inputs of %s must be a list" % name)
+            fanin = [_endpoint_id(source) for source in inputs]
+            gates[gate_id] = Gate(gate_id, gate_type, str(name), fanin, _parse_delay(component.get('delay'), name))
+
+        for connection in connections:
+            if not isinstance(connection, dict):
+                raise ValueError("Each connection must be an object")
+            source = _endpoint_id(connection.get('from'))
+            target = _endpoint_id(connection.get('to'))
+            if target in gates and source not in gates[target].fanin:
+                gates[target].fanin.append(source)
+
+        for gate in gates.values():
+            for source in gate.fanin:
+                if source not in gates:
+                    raise ValueError("Gate %s is driven by unknown component %s" % (gate.name, source))
+            if gate.type in INPUT_TYPES:
+                if gate.fanin:
+                    raise ValueError("Input %s cannot have a driver" % gate.name)
+            elif not gate.fanin:
+                raise ValueError("Gate %s has no inputs" % gate.name)
+            elif gate.type in ('not', 'buffer') + OUTPUT_TYPES and len(gate.fanin) != 1:
+                raise ValueError("Gate %s must have exactly one input" % gate.name)
+        return cls(gates)
+
+    def topological_order(self):
+        """Gate ids ordered so every gate follows its fan-in (Kahn's algorithm)."""
+        if self._order is None:
+            pending = {gate_id: len(gate.fanin) for gate_id, gate in self.gates.items()}
+            ready = deque(gate_id for gate_id, count in pending.items() if count == 0)
+            order = []
+            while ready:
+                gate_id = ready.popleft()
+                order.append(gate_id)
+                for sink in self.fanout[gate_id]:
+                    pending[sink] -= 1
+                    if pending[sink] == 0:
+                        ready.append(sink)
+            if len(order) != len(self.gates):
+                raise ValueError("Circuit contains a combinational loop")
+            self._order = order
+        return self._order
+
+    def gate_count(self):
+        return sum(1 for gate in self.gates.values() if gate.type in GATE_TYPES and gate.type != 'buffer')
+
+    def input_names(self):
+        return [self.gates[gate_id].name for gate_id in self.inputs]
+
+    def truth_tables(self):
+        """Map each output name to the bitset of input rows where it is 1."""
+        num_inputs = len(self.inputs)
+        full = (1 << (1 << num_inputs)) - 1
+        values = {}
+        for index, gate_id in enumerate(self.inputs):
+            values[gate_id] = variable_pattern(num_inputs, index)
+        for gate_id in self.topological_order():
+            gate = self.gates[gate_id]
+            if gate.type in INPUT_TYPES:
+                continue
+            fanin_values = [values[source] for source in gate.fanin]
+            if gate.type in OUTPUT_TYPES:
+                values[gate_id] = fanin_values[0]
+            else:
+                values[gate_id] = GATE_TYPES[gate.type](fanin_values, full)
+        return {self.gates[gate_id].name: values[gate_id] for gate_id in self.outputs}
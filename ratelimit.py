@@ -0,0 +1,257 @@
+"""Rate limiting and load shedding for write endpoints.
+
+State lives in a small memory-mapped file so every gunicorn worker on the
+host shares it without an external service. The file holds:
+
+* an open-addressed table of token buckets keyed by ``route:client``,
+* one in-flight request counter per worker process, used for a global
+  concurrency cap; slots whose worker has not touched them for
+  ``WORKER_TTL_SECONDS`` are ignored and reclaimed,
+* a decaying average of connection-pool checkout wait.
+
+Access is serialized with ``fcntl.lockf`` between processes and a thread
+lock within a process. Platforms without ``fcntl`` fall back to a
+per-process store.
+"""
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, jsonify, request
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+BUCKET_SLOTS = 4096
+PROBE_LENGTH = 16
+WORKER_SLOTS = 64
+# Longer than gunicorn's worker timeout, so only dead or replaced workers expire
+WORKER_TTL_SECONDS = 120.0
+WAIT_DECAY_SECONDS = 5.0
+WAIT_SMOOTHING = 0.2
+
+_MAGIC = b'VHRL0002'
+_BUCKET = struct.Struct('<Qdd')  # key hash, tokens, last refill
+_WORKER = struct.Struct('<iid')  # pid, in-flight requests, heartbeat
+_GAUGE = struct.Struct('<dd')  # average checkout wait, last update
+_BUCKETS_OFFSET = len(_MAGIC)
+_WORKERS_OFFSET = _BUCKETS_OFFSET + BUCKET_SLOTS * _BUCKET.size
+_GAUGE_OFFSET = _WORKERS_OFFSET + WORKER_SLOTS * _WORKER.size
+STORE_SIZE = _GAUGE_OFFSET + _GAUGE.size
+
+
+def _key_hash(key):
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1
+
+
+class SharedStore:
+    def __init__(self, path=None):
+        self.path = path
+        self.pid = os.getpid()
+        self._thread_lock = threading.Lock()
+        if path is not None and fcntl is not None:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if os.fstat(fd).st_size < STORE_SIZE:
+                    os.ftruncate(fd, STORE_SIZE)
+                self._buffer = mmap.mmap(fd, STORE_SIZE)
+            finally:
+                os.close(fd)
+            self._file = open(path, 'rb+')
+        else:
+            self._buffer = bytearray(STORE_SIZE)
+            self._file = None
+        self._worker_slot = None
+        self._lock()
+        try:
+            # Start from a clean table if the file is new or has an old layout
+            if self._buffer[:len(_MAGIC)] != _MAGIC:
+                self._buffer[:STORE_SIZE] = bytes(STORE_SIZE)
+                self._buffer[:len(_MAGIC)] = _MAGIC
+        finally:
+            self._unlock()
+
+    def _lock(self):
+        self._thread_lock.acquire()
+        if self._file is not None:
+            fcntl.lockf(self._file, fcntl.LOCK_EX)
+
+    def _unlock(self):
+        if self._file is not None:
+            fcntl.lockf(self._file, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+    def take(self, key, capacity, rate, now=None):
+        """Take one token; returns 0 if allowed, else seconds until retry."""
+        now = time.time() if now is None else now
+        key_hash = _key_hash(key)
+        start = key_hash % BUCKET_SLOTS
+        self._lock()
+        try:
+            slot = reusable = oldest = None
+            oldest_time = math.inf
+            for probe in range(PROBE_LENGTH):
+                index = (start + probe) % BUCKET_SLOTS
+                stored_hash, tokens, updated = _BUCKET.unpack_from(self._buffer, _BUCKETS_OFFSET + index * _BUCKET.size)
+                if stored_hash == key_hash:
+                    slot = index
+                    break
+                if stored_hash == 0 or now - updated >= capacity / rate:
+                    if reusable is None:
+                        reusable = index
+                elif updated < oldest_time:
+                    oldest, oldest_time = index, updated
+
+            if slot is None:
+                # A new or evicted bucket starts full
+                slot = reusable if reusable is not None else oldest
+                tokens = float(capacity)
+            else:
+                tokens = min(float(capacity), tokens + (now - updated) * rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0
+            else:
+                retry_after = (1 - tokens) / rate
+            _BUCKET.pack_into(self._buffer, _BUCKETS_OFFSET + slot * _BUCKET.size, key_hash, tokens, now)
+            return retry_after
+        finally:
+            self._unlock()
+
+    def _claim_worker_slot(self, now):
+        # A slot is free once its worker stops heartbeating, which also covers
+        # pids reused by unrelated processes after a restart.
+        pid = os.getpid()
+        for index in range(WORKER_SLOTS):
+            offset = _WORKERS_OFFSET + index * _WORKER.size
+            slot_pid, _, heartbeat = _WORKER.unpack_from(self._buffer, offset)
+            if slot_pid == 0 or slot_pid == pid or now - heartbeat >= WORKER_TTL_SECONDS:
+                _WORKER.pack_into(self._buffer, offset, pid, 0, now)
+                return offset
+        return None
+
+    def enter(self, limit, now=None):
+        """Count a request as in flight unless ``limit`` are already running."""
+        now = time.time() if now is None else now
+        self._lock()
+        try:
+            if self._worker_slot is None or _WORKER.unpack_from(self._buffer, self._worker_slot)[0] != os.getpid():
+                self._worker_slot = self._claim_worker_slot(now)
+                if self._worker_slot is None:
+                    return True
+            in_flight = sum(
+                count for _, count, heartbeat in _WORKER.iter_unpack(self._buffer[_WORKERS_OFFSET:_GAUGE_OFFSET])
+                if now - heartbeat < WORKER_TTL_SECONDS
+            )
+            if in_flight >= limit:
+                return False
+            pid, count, _ = _WORKER.unpack_from(self._buffer, self._worker_slot)
+            _WORKER.pack_into(self._buffer, self._worker_slot, pid, count + 1, now)
+            return True
+        finally:
+            self._unlock()
+
+    def leave(self, now=None):
+        if self._worker_slot is None:
+            return
+        now = time.time() if now is None else now
+        self._lock()
+        try:
+            pid, count, _ = _WORKER.unpack_from(self._buffer, self._worker_slot)
+            if pid == os.getpid():
+                _WORKER.pack_into(self._buffer, self._worker_slot, pid, max(0, count - 1), now)
+        finally:
+            self._unlock()
+
+    def _decayed_wait(self, now):
+        wait, updated = _GAUGE.unpack_from(self._buffer, _GAUGE_OFFSET)
+        return wait * math.exp(-max(0.0, now - updated) / WAIT_DECAY_SECONDS)
+
+    def record_wait(self, seconds, now=None):
+        now = time.time() if now is None else now
+        self._lock()
+        try:
+            wait = self._decayed_wait(now)
+            wait += WAIT_SMOOTHING * (seconds - wait)
+            _GAUGE.pack_into(self._buffer, _GAUGE_OFFSET, wait, now)
+        finally:
+            self._unlock()
+
+    def checkout_wait(self, now=None):
+        """Recent average pool checkout wait, decaying while idle."""
+        now = time.time() if now is None else now
+        self._lock()
+        try:
+            return self._decayed_wait(now)
+        finally:
+            self._unlock()
+
+
+_stores = {}
+
+
+def get_store():
+    path = current_app.config.get("RATELIMIT_STORAGE")
+    store = _stores.get(path)
+    # Re-open after fork so each worker owns its mapping and lock
+    if store is None or store.pid != os.getpid():
+        store = _stores[path] = SharedStore(path)
+    return store
+
+
+def _too_busy(status, retry_after, message):
+    response = jsonify({"status": "error", "message": message})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def client_key():
+    # Every visitor resolves to the shared demo user and session cookies are
+    # client-controlled, so the proxied address is the only per-client key.
+    return 'ip:%s' % request.remote_addr
+
+
+def rate_limit(capacity, period, methods=('POST',)):
+    """Token bucket of ``capacity`` requests per ``period`` seconds per client.
+
+    Admitted requests also pass the global write concurrency cap and the
+    pool checkout-wait check before the view touches the database.
+    """
+    rate = capacity / float(period)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in methods:
+                return view(*args, **kwargs)
+
+            store = get_store()
+            retry_after = store.take('%s:%s' % (request.endpoint, client_key()), capacity, rate)
+            if retry_after:
+                return _too_busy(429, retry_after, "Too many requests")
+
+            if store.checkout_wait() > current_app.config["MAX_POOL_CHECKOUT_WAIT"]:
+                return _too_busy(503, WAIT_DECAY_SECONDS, "Server is busy, try again shortly")
+            if not store.enter(current_app.config["MAX_CONCURRENT_WRITES"]):
+                return _too_busy(503, 1, "Server is busy, try again shortly")
+            try:
+                from app import db
+
+                start = time.monotonic()
+                db.session.connection()
+                store.record_wait(time.monotonic() - start)
+                return view(*args, **kwargs)
+            finally:
+                store.leave()
+        return wrapper
+    return decorator
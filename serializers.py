@@ -0,0 +1,176 @@
+"""Fast serialization path for list and dashboard endpoints.
+
+Rows are selected as plain column tuples (no ORM hydration or identity map)
+and encoded straight to JSON bytes. JSON stored in text columns is spliced
+into the output as a pre-encoded fragment instead of being decoded and
+re-encoded. ``orjson`` is used when installed; otherwise a small encoder
+built on the stdlib string escaper is used.
+"""
+from datetime import date, datetime
+from json.encoder import encode_basestring_ascii
+
+from flask import Response
+from sqlalchemy import Float, case, cast, func, select
+
+from app import db
+from models import Achievement, CircuitDesign, LearningSession, QuizAttempt
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class RawJSON(str):
+    """Text that is already valid JSON and is emitted verbatim."""
+    __slots__ = ()
+
+
+if orjson is not None and hasattr(orjson, 'Fragment'):
+    raw_json = orjson.Fragment
+else:
+    raw_json = RawJSON
+
+
+def _encode(value, out):
+    if isinstance(value, RawJSON):
+        out.append(value)
+    elif isinstance(value, str):
+        out.append(encode_basestring_ascii(value))
+    elif value is None:
+        out.append('null')
+    elif value is True:
+        out.append('true')
+    elif value is False:
+        out.append('false')
+    elif isinstance(value, int):
+        out.append(int.__repr__(value))
+    elif isinstance(value, float):
+        out.append(float.__repr__(value))
+    elif isinstance(value, (datetime, date)):
+        out.append('"%s"' % value.isoformat())
+    elif isinstance(value, dict):
+        out.append('{')
+        first = True
+        for key, item in value.items():
+            if not first:
+                out.append(',')
+            first = False
+            out.append(encode_basestring_ascii(str(key)))
+            out.append(':')
+            _encode(item, out)
+        out.append('}')
+    elif isinstance(value, (list, tuple)):
+        out.append('[')
+        for index, item in enumerate(value):
+            if index:
+                out.append(',')
+            _encode(item, out)
+        out.append(']')
+    else:
+        raise TypeError("Object of type %s is not JSON serializable" % type(value).__name__)
+
+
+def dumps(obj):
+    """Encode ``obj`` to JSON bytes, splicing :func:`raw_json` values verbatim."""
+    if raw_json is not RawJSON:
+        return orjson.dumps(obj)
+    out = []
+    _encode(obj, out)
+    return ''.join(out).encode('utf-8')
+
+
+def json_response(obj, status=200):
+    return Response(dumps(obj), status=status, mimetype='application/json')
+
+
+def _rows(keys, statement):
+    return [dict(zip(keys, row)) for row in db.session.execute(statement)]
+
+
+ACHIEVEMENT_KEYS = ('id', 'name', 'description', 'icon', 'unlocked_at')
+
+
+def achievement_rows(user_id):
+    return _rows(ACHIEVEMENT_KEYS, select(
+        Achievement.achievement_id,
+        Achievement.name,
+        Achievement.description,
+        Achievement.icon,
+        Achievement.unlocked_at,
+    ).where(Achievement.user_id == user_id))
+
+
+LEARNING_SESSION_KEYS = (
+    'id', 'module_id', 'module_name', 'lesson_id', 'lesson_name', 'session_type',
+    'duration_minutes', 'xp_earned', 'completed', 'started_at', 'completed_at',
+)
+
+
+def learning_session_rows(user_id, since):
+    return _rows(LEARNING_SESSION_KEYS, select(
+        LearningSession.id,
+        LearningSession.module_id,
+        LearningSession.module_name,
+        LearningSession.lesson_id,
+        LearningSession.lesson_name,
+        LearningSession.session_type,
+        LearningSession.duration_minutes,
+        LearningSession.xp_earned,
+        LearningSession.completed,
+        LearningSession.started_at,
+        LearningSession.completed_at,
+    ).where(
+        LearningSession.user_id == user_id,
+        LearningSession.started_at >= since,
+    ).order_by(LearningSession.started_at.desc()))
+
+
+def circuit_design_rows(user_id):
+    statement = select(
+        CircuitDesign.id,
+        CircuitDesign.name,
+        CircuitDesign.description,
+        CircuitDesign.design_data,
+        CircuitDesign.is_public,
+        CircuitDesign.simulation_results,
+        CircuitDesign.created_at,
+        CircuitDesign.updated_at,
+    ).where(CircuitDesign.user_id == user_id).order_by(CircuitDesign.updated_at.desc())
+    return [
+        {
+            'id': circuit_id,
+            'name': name,
+            'description': description,
+            'design_data': raw_json(design_data or '{}'),
+            'is_public': is_public,
+            'simulation_results': raw_json(simulation_results or '{}'),
+            'created_at': created_at,
+            'updated_at': updated_at,
+        }
+        for circuit_id, name, description, design_data, is_public,
+        simulation_results, created_at, updated_at in db.session.execute(statement)
+    ]
+
+
+def quiz_summary(user_id):
+    """``(attempt_count, best_percentage)`` computed in a single aggregate query."""
+    percentage = case(
+        (QuizAttempt.total_questions > 0,
+         cast(QuizAttempt.correct_answers, Float) / QuizAttempt.total_questions * 100),
+        else_=0,
+    )
+    count, best = db.session.execute(
+        select(func.count(QuizAttempt.id), func.max(percentage)).where(QuizAttempt.user_id == user_id)
+    ).one()
+    return count, best or 0
+
+
+def activity_rows(user_id, since):
+    return db.session.execute(select(
+        LearningSession.started_at,
+        LearningSession.xp_earned,
+    ).where(
+        LearningSession.user_id == user_id,
+        LearningSession.started_at >= since,
+    )).all()
@@ -30,6 +30,9 @@ setup(
         "email-validator>=2.1.0",
     ],
     extras_require={
+        "fast": [
+            "orjson>=3.9.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "black>=23.0.0",
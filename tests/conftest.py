@@ -0,0 +1,29 @@
+import os
+import tempfile
+
+import pytest
+
+# The app reads its configuration at import time
+_tmpdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(_tmpdir, "test.db"))
+os.environ.setdefault("RATELIMIT_STORAGE", os.path.join(_tmpdir, "ratelimit"))
+
+
+@pytest.fixture
+def app(tmp_path):
+    from app import app, db
+    import models  # noqa: F401
+
+    app.config["TESTING"] = True
+    # Fresh rate-limit buckets for every test
+    app.config["RATELIMIT_STORAGE"] = str(tmp_path / "ratelimit")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
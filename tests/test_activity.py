@@ -0,0 +1,132 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from activity import longest_run, trailing_run
+
+
+def test_bit_helpers():
+    assert trailing_run(0b0111, 4) == 0
+    assert trailing_run(0b1110, 4) == 3
+    assert trailing_run(0b1111, 4) == 4
+    assert longest_run(0b1110111101) == 4
+    assert longest_run(0) == 0
+
+
+@pytest.fixture
+def user(app):
+    from app import get_current_user
+
+    return get_current_user()
+
+
+def mark_days(user, days):
+    from app import db
+    from models import ActivityYear
+
+    for day in days:
+        ActivityYear.mark(user.id, day)
+    db.session.commit()
+
+
+def test_streak_and_heatmap_across_year_boundary(user):
+    from activity import activity_summary, current_streak
+
+    mark_days(user, [date(2025, 12, 27), date(2025, 12, 30), date(2025, 12, 31),
+                     date(2026, 1, 1), date(2026, 1, 2)])
+
+    summary = activity_summary(user.id, today=date(2026, 1, 2), days=7)
+    assert summary['start'] == '2025-12-27'
+    assert summary['heatmap'] == '1001111'
+    assert summary['active_days'] == 5
+    assert summary['current_streak'] == 4
+    assert summary['longest_streak'] == 4
+
+    # Still alive the day after, broken once a full day is missed
+    assert current_streak(user.id, date(2026, 1, 3)) == 4
+    assert current_streak(user.id, date(2026, 1, 4)) == 0
+
+
+def test_leap_day_and_year_end(user):
+    from activity import activity_summary
+    from models import ActivityYear
+
+    mark_days(user, [date(2024, 2, 29), date(2024, 12, 31), date(2025, 1, 1)])
+    row = ActivityYear.query.filter_by(user_id=user.id, year=2024).one()
+    assert row.is_active(date(2024, 12, 31))
+    assert row.get_bits() >> 365 & 1
+    assert activity_summary(user.id, today=date(2025, 1, 1))['current_streak'] == 2
+
+
+def test_progress_streak_matches_heatmap(client):
+    client.post('/api/progress', json={'action': 'complete_lesson', 'module_id': 'm'})
+    progress = client.get('/api/progress').get_json()
+    heatmap = client.get('/api/activity/heatmap').get_json()
+    assert progress['streak_days'] == heatmap['current_streak'] == 1
+    assert heatmap['heatmap'].endswith('1')
+
+
+def test_update_streak_uses_bitmap(user):
+    from app import db
+
+    today = datetime.utcnow().date()
+    mark_days(user, [today - timedelta(days=2), today - timedelta(days=1)])
+    progress = user.get_or_create_progress()
+    progress.update_streak()
+    db.session.commit()
+    assert progress.streak_days == 3
+
+
+def test_concurrent_first_insert_keeps_transaction(user, monkeypatch):
+    from app import db
+    from models import ActivityYear
+
+    day = date(2026, 3, 1)
+    mark_days(user, [day - timedelta(days=1)])
+
+    # Simulate another worker inserting the row between our lookup and insert
+    original = ActivityYear.find.__func__
+    calls = []
+
+    def racing_find(cls, user_id, year):
+        calls.append(year)
+        return None if len(calls) == 1 else original(cls, user_id, year)
+
+    monkeypatch.setattr(ActivityYear, 'find', classmethod(racing_find))
+    progress = user.get_or_create_progress()
+    progress.xp = 123
+    ActivityYear.mark(user.id, day)
+    db.session.commit()
+
+    assert len(calls) == 2
+    row = ActivityYear.query.filter_by(user_id=user.id, year=2026).one()
+    assert row.is_active(day) and row.is_active(day - timedelta(days=1))
+    assert user.get_or_create_progress().xp == 123
+
+
+def test_backfill_from_sessions(user):
+    from activity import backfill_from_sessions, current_streak, load_bitmap
+    from app import db
+    from models import LearningSession
+
+    today = datetime.utcnow().date()
+    days = [today - timedelta(days=n) for n in (0, 1, 2, 10, 400)]
+    for day in days:
+        for hour in (9, 17):
+            db.session.add(LearningSession(
+                user_id=user.id, module_id='m', module_name='M', session_type='lesson',
+                started_at=datetime.combine(day, datetime.min.time()) + timedelta(hours=hour),
+            ))
+    progress = user.get_or_create_progress()
+    db.session.commit()
+
+    assert backfill_from_sessions() == len({day.year for day in days})
+    start = today - timedelta(days=400)
+    bits = load_bitmap(user.id, start, today)
+    assert [n for n in range(401) if bits >> n & 1] == sorted((day - start).days for day in days)
+    assert current_streak(user.id, today) == 3
+    assert progress.streak_days == 3
+
+    # Running it again is idempotent
+    backfill_from_sessions()
+    assert load_bitmap(user.id, start, today) == bits
@@ -0,0 +1,120 @@
+import random
+import time
+
+import pytest
+
+from minimizer import (
+    MAX_INPUTS, QM_MAX_INPUTS, _cube_rows, _minimize_cached, minimize, minimize_design, minimize_truth_table, parse_truth_table,
+)
+
+
+def assert_valid_cover(num_inputs, on, dc, cubes):
+    full = (1 << (1 << num_inputs)) - 1
+    covered = 0
+    for cube in cubes:
+        covered |= _cube_rows(num_inputs, *cube)
+    assert covered & on == on
+    assert not covered & full & ~(on | dc)
+
+
+def random_function(num_inputs, seed):
+    rng = random.Random(seed)
+    on = rng.getrandbits(1 << num_inputs)
+    dc = rng.getrandbits(1 << num_inputs) & rng.getrandbits(1 << num_inputs) & ~on
+    return on, dc
+
+
+@pytest.mark.parametrize("num_inputs", [1, 2, 4, 7, 10, 11, 13])
+def test_cover_matches_on_and_dc_sets(num_inputs):
+    for seed in range(3):
+        on, dc = random_function(num_inputs, seed)
+        assert_valid_cover(num_inputs, on, dc, minimize(num_inputs, on, dc))
+
+
+def test_textbook_kmap():
+    result = minimize_truth_table({'minterms': [0, 1, 2, 5, 6, 7, 8, 9, 10, 14]})
+    assert result['inputs'] == ['A', 'B', 'C', 'D']
+    assert result['outputs'][0]['terms'] == 3
+    assert result['outputs'][0]['literals'] == 7
+
+
+def test_dont_cares_are_used():
+    result = minimize_truth_table({'outputs': [0, 1, 'x', 1]})
+    assert result['outputs'][0]['sop'] == 'B'
+
+
+def test_constants():
+    assert minimize(3, 0) == ()
+    assert minimize(3, 0b1111_0000, 0b0000_1111) == ((0, 0),)
+
+
+def test_design_gate_count():
+    design = {'components': [
+        {'id': 1, 'type': 'input', 'label': 'A'},
+        {'id': 2, 'type': 'input', 'label': 'B'},
+        {'id': 3, 'type': 'and', 'inputs': [1, 2]},
+        {'id': 5, 'type': 'not', 'inputs': [2]},
+        {'id': 4, 'type': 'and', 'inputs': [1, 5]},
+        {'id': 6, 'type': 'or', 'inputs': [3, 4]},
+        {'id': 7, 'type': 'output', 'label': 'F', 'inputs': [6]},
+    ]}
+    result = minimize_design(design)
+    assert result['outputs'][0]['sop'] == 'A'
+    assert result['gate_count'] == {'original': 4, 'minimized': 0, 'is_minimal': False}
+
+
+@pytest.mark.parametrize("payload", [
+    {'minterms': [2 ** 34]},
+    {'minterms': [1], 'dont_cares': [10 ** 100]},
+    {'minterms': [-1]},
+    {'inputs': ['A', 'B'], 'minterms': [4]},
+    {'outputs': [0, 1, 1]},
+])
+def test_rejects_out_of_range_rows(payload):
+    with pytest.raises(ValueError):
+        parse_truth_table(payload)
+
+
+@pytest.mark.parametrize("payload", [
+    [1, 0],
+    {'minterms': [None]},
+    {'minterms': [1.7]},
+    {'minterms': [True]},
+    {'minterms': 5},
+    {'outputs': 5},
+    {'inputs': 3, 'minterms': [1]},
+    {'inputs': ['A', 2], 'minterms': [1]},
+])
+def test_rejects_malformed_payloads(payload):
+    with pytest.raises(ValueError):
+        parse_truth_table(payload)
+
+
+@pytest.mark.parametrize("body", [
+    [1, 2],
+    {'truth_table': [1, 0]},
+    {'truth_table': {'minterms': [None]}},
+    {'truth_table': {'outputs': 5}},
+    {'truth_table': {'inputs': 3, 'minterms': [1]}},
+    {'truth_table': {'minterms': [1], 'output': ['F']}},
+    {'circuit_id': 'abc'},
+])
+def test_endpoint_returns_400_for_malformed_payloads(client, body):
+    response = client.post('/api/logic/minimize', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+
+
+def test_only_small_functions_are_memoized():
+    _minimize_cached.cache_clear()
+    minimize(QM_MAX_INPUTS, *random_function(QM_MAX_INPUTS, seed=1))
+    minimize(QM_MAX_INPUTS + 1, *random_function(QM_MAX_INPUTS + 1, seed=1))
+    assert _minimize_cached.cache_info().currsize == 1
+
+
+def test_espresso_at_input_cap_fits_request_budget():
+    on, dc = random_function(MAX_INPUTS, seed=0)
+    start = time.perf_counter()
+    cubes = minimize(MAX_INPUTS, on, dc)
+    assert time.perf_counter() - start < 10
+    assert_valid_cover(MAX_INPUTS, on, dc, cubes)
@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+import ratelimit
+from ratelimit import WORKER_TTL_SECONDS, SharedStore, get_store
+
+PROGRESS_LIMIT = 60
+
+
+def submit(client, **kwargs):
+    return client.post('/api/progress', json={'action': 'update_study_time', 'minutes': 1}, **kwargs)
+
+
+def exhaust(client, **kwargs):
+    for _ in range(PROGRESS_LIMIT):
+        assert submit(client, **kwargs).status_code == 200
+    return submit(client, **kwargs)
+
+
+def test_bucket_returns_429_with_retry_after(client):
+    response = exhaust(client)
+    assert response.status_code == 429
+    assert response.get_json()['status'] == 'error'
+    assert int(response.headers['Retry-After']) >= 1
+
+
+def test_clients_get_separate_buckets(app):
+    # Both browsers keep cookies and resolve to the shared demo user
+    first = app.test_client()
+    second = app.test_client()
+    assert exhaust(first, headers={'X-Forwarded-For': '203.0.113.1'}).status_code == 429
+    assert submit(second, headers={'X-Forwarded-For': '203.0.113.2'}).status_code == 200
+
+
+def test_key_ignores_session_contents(app):
+    client = app.test_client()
+    assert exhaust(client, headers={'X-Forwarded-For': '203.0.113.1'}).status_code == 429
+    with client.session_transaction() as session:
+        session['user_id'] = 12345
+    assert submit(client, headers={'X-Forwarded-For': '203.0.113.1'}).status_code == 429
+
+
+def test_rightmost_forwarded_hop_is_used(app):
+    client = app.test_client(use_cookies=False)
+    spoofed = {'X-Forwarded-For': '198.51.100.7, 203.0.113.1'}
+    assert exhaust(client, headers=spoofed).status_code == 429
+    # A different client-supplied prefix does not buy a fresh bucket
+    assert submit(client, headers={'X-Forwarded-For': '198.51.100.8, 203.0.113.1'}).status_code == 429
+    assert submit(client, headers={'X-Forwarded-For': '203.0.113.2'}).status_code == 200
+
+
+def test_concurrency_cap_returns_503(app, client):
+    app.config['MAX_CONCURRENT_WRITES'] = 0
+    try:
+        response = submit(client)
+    finally:
+        app.config['MAX_CONCURRENT_WRITES'] = 12
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_slow_pool_checkout_returns_503(app, client):
+    get_store().record_wait(10)
+    response = submit(client)
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) == int(ratelimit.WAIT_DECAY_SECONDS)
+
+
+def occupy_slots(store, pid, count, heartbeat, slots=1):
+    for index in range(slots):
+        offset = ratelimit._WORKERS_OFFSET + index * ratelimit._WORKER.size
+        ratelimit._WORKER.pack_into(store._buffer, offset, pid, count, heartbeat)
+
+
+def test_stale_worker_slots_expire(tmp_path):
+    store = SharedStore(str(tmp_path / 'store'))
+    # Another worker, still alive, with a request in flight
+    occupy_slots(store, os.getppid(), 1, 1000.0)
+    assert not store.enter(1, now=1001.0)
+    # Once it stops heartbeating its count no longer holds the cap
+    assert store.enter(1, now=1000.0 + WORKER_TTL_SECONDS)
+
+
+def test_stale_slot_reclaimed_when_table_is_full(tmp_path):
+    store = SharedStore(str(tmp_path / 'store'))
+    occupy_slots(store, os.getppid(), 1, 0.0, slots=ratelimit.WORKER_SLOTS)
+    assert store.enter(1, now=WORKER_TTL_SECONDS)
+    assert not store.enter(1, now=WORKER_TTL_SECONDS)
+    store.leave(now=WORKER_TTL_SECONDS)
+    assert store.enter(1, now=WORKER_TTL_SECONDS)
+
+
+def test_old_layout_is_reset(tmp_path):
+    path = tmp_path / 'store'
+    path.write_bytes(b'\xff' * ratelimit.STORE_SIZE)
+    store = SharedStore(str(path))
+    assert store.checkout_wait(now=0.0) == 0.0
+    assert store.enter(1, now=0.0)
+
+
+@pytest.mark.parametrize('capacity', [1, 5])
+def test_take_refills_over_time(tmp_path, capacity):
+    store = SharedStore(str(tmp_path / 'store'))
+    for _ in range(capacity):
+        assert store.take('k', capacity, 1.0, now=0.0) == 0
+    assert store.take('k', capacity, 1.0, now=0.0) == pytest.approx(1.0)
+    assert store.take('k', capacity, 1.0, now=1.0) == 0
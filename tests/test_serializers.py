@@ -0,0 +1,86 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def seeded(app):
+    from app import db, get_current_user
+    from models import Achievement, CircuitDesign, LearningSession, QuizAttempt
+
+    user = get_current_user()
+    now = datetime.utcnow()
+    for i in range(5):
+        session = LearningSession(
+            user_id=user.id, module_id='m%d' % i, module_name='Module "%d" é' % i,
+            lesson_id=None if i % 2 else 'l%d' % i, session_type='lesson',
+            started_at=now - timedelta(days=i, microseconds=i * 7),
+        )
+        if i % 2:
+            session.complete_session(10 * i)
+        db.session.add(session)
+        circuit = CircuitDesign(user_id=user.id, name='Circuit %d' % i, description=None if i else 'x')
+        circuit.set_design_data({'components': [{'id': i, 'type': 'input', 'label': 'Aé'}]})
+        if i % 2:
+            circuit.set_simulation_results({'critical_delay': 12.5, 'path': ['1', '2']})
+        db.session.add(circuit)
+        db.session.add(QuizAttempt(
+            user_id=user.id, quiz_id='q', quiz_name='Quiz', score=i, total_questions=7 if i else 0,
+            correct_answers=i, time_taken=60,
+        ))
+    db.session.add(Achievement(user_id=user.id, achievement_id='perfect_score', name='Perfect Score',
+                               description='Scored 100% on a quiz', icon='fa-star'))
+    db.session.commit()
+    return user
+
+
+def test_achievements_match_to_dict(client, seeded):
+    from models import Achievement
+
+    expected = [a.to_dict() for a in Achievement.query.filter_by(user_id=seeded.id).all()]
+    assert client.get('/api/achievements').get_json() == {'achievements': expected}
+
+
+def test_learning_sessions_match_to_dict(client, seeded):
+    from models import LearningSession
+
+    expected = [s.to_dict() for s in LearningSession.query.filter_by(user_id=seeded.id).order_by(
+        LearningSession.started_at.desc()).all()]
+    assert client.get('/api/learning-sessions').get_json() == {'sessions': expected}
+
+
+def test_circuit_designs_match_to_dict(client, seeded):
+    from models import CircuitDesign
+
+    expected = [c.to_dict() for c in CircuitDesign.query.filter_by(user_id=seeded.id).order_by(
+        CircuitDesign.updated_at.desc()).all()]
+    assert client.get('/api/circuit-designs').get_json() == {'circuits': expected}
+
+
+def test_dashboard_quiz_stats_match_orm(client, seeded):
+    from models import QuizAttempt
+
+    attempts = QuizAttempt.query.filter_by(user_id=seeded.id).all()
+    stats = client.get('/api/dashboard-stats').get_json()['quiz_stats']
+    assert stats['total_attempts'] == len(attempts)
+    assert stats['best_score'] == pytest.approx(max(a.get_percentage() for a in attempts))
+
+
+def test_stdlib_encoder_splices_raw_json(app):
+    from serializers import RawJSON, _encode
+
+    value = {
+        'text': 'quote " and é',
+        'numbers': [1, 2.5, -0.0, None, True, False],
+        'when': datetime(2024, 1, 2, 3, 4, 5, 6),
+        'raw': RawJSON('{"k": [1, 2]}'),
+    }
+    out = []
+    _encode(value, out)
+    assert json.loads(''.join(out)) == {
+        'text': 'quote " and é',
+        'numbers': [1, 2.5, -0.0, None, True, False],
+        'when': '2024-01-02T03:04:05.000006',
+        'raw': {'k': [1, 2]},
+    }
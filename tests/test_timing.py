@@ -0,0 +1,166 @@
+import copy
+import random
+
+import pytest
+
+from netlist import Netlist
+from timing import TimingAnalysis, analyze_design
+
+GATE_TYPES = ['and', 'or', 'nand', 'nor', 'xor', 'not', 'buffer']
+
+
+def random_design(size, seed):
+    rng = random.Random(seed)
+    components = [{'id': i, 'type': 'input', 'label': 'I%d' % i} for i in range(8)]
+    for i in range(8, size):
+        gate_type = rng.choice(GATE_TYPES)
+        arity = 1 if gate_type in ('not', 'buffer') else 2
+        components.append({'id': i, 'type': gate_type, 'inputs': rng.sample(range(max(0, i - 30), i), arity)})
+    components.append({'id': size, 'type': 'output', 'label': 'F', 'inputs': [size - 1]})
+    return {'components': components}
+
+
+def assert_same_timing(incremental, full):
+    assert incremental['gates'].keys() == full['gates'].keys()
+    for gate_id, expected in full['gates'].items():
+        actual = incremental['gates'][gate_id]
+        assert actual['level'] == expected['level']
+        for field in ('delay', 'arrival', 'required', 'slack'):
+            assert actual[field] == pytest.approx(expected[field]), (gate_id, field)
+    assert incremental['critical_delay'] == pytest.approx(full['critical_delay'])
+
+
+def rewire(design, rng):
+    component = rng.choice(design['components'][8:-1])
+    component['type'] = rng.choice(['and', 'or', 'xor'])
+    component['inputs'] = rng.sample(range(max(0, component['id'] - 30), component['id']), 2)
+
+
+def add_gate(design, rng):
+    new_id = max(c['id'] for c in design['components']) + 1
+    design['components'].append({'id': new_id, 'type': 'not', 'inputs': [rng.randrange(8, 200)]})
+
+
+def remove_gate(design, rng):
+    # Drop a dangling gate and rewire one of its readers to keep the netlist valid
+    victim = rng.choice(design['components'][8:-1])
+    design['components'].remove(victim)
+    for component in design['components']:
+        component['inputs'] = [
+            source if source != victim['id'] else rng.randrange(0, 8)
+            for source in component.get('inputs', [])
+        ]
+
+
+@pytest.mark.parametrize("edit", [rewire, add_gate, remove_gate])
+def test_incremental_matches_full_analysis(edit):
+    for seed in range(5):
+        rng = random.Random(seed)
+        design = random_design(400, seed)
+        report = analyze_design(design)
+        revised = copy.deepcopy(design)
+        for _ in range(3):
+            edit(revised, rng)
+        incremental = analyze_design(revised, previous=(design, report))
+        assert_same_timing(incremental, analyze_design(revised))
+        assert incremental['retimed_gates'] < len(incremental['gates'])
+
+
+def test_retime_only_touches_affected_cone():
+    design = random_design(2000, seed=1)
+    analysis = TimingAnalysis(Netlist.from_design_data(design))
+    revised = copy.deepcopy(design)
+    revised['components'][-5]['type'] = 'xor'
+    assert analysis.retime(Netlist.from_design_data(revised)) < 200
+
+
+def test_critical_path_and_clock_period():
+    design = {'components': [
+        {'id': 1, 'type': 'input'},
+        {'id': 2, 'type': 'and', 'inputs': [1, 1]},
+        {'id': 3, 'type': 'not', 'inputs': [2]},
+        {'id': 4, 'type': 'output', 'inputs': [3]},
+    ]}
+    report = analyze_design(design, clock_period=100)
+    assert report['critical_path'] == ['1', '2', '3', '4']
+    assert report['critical_delay'] == pytest.approx(37.0)
+    assert report['worst_slack'] == pytest.approx(63.0)
+
+
+def test_combinational_loop_is_rejected():
+    design = {'components': [
+        {'id': 1, 'type': 'input'},
+        {'id': 2, 'type': 'and', 'inputs': [1, 3]},
+        {'id': 3, 'type': 'not', 'inputs': [2]},
+        {'id': 4, 'type': 'output', 'inputs': [3]},
+    ]}
+    with pytest.raises(ValueError):
+        analyze_design(design)
+
+
+@pytest.mark.parametrize("design_data", [
+    {'components': ['x']},
+    {'components': {'id': 1}},
+    {'components': [{'id': 1, 'type': 'input'}], 'connections': [3]},
+    {'components': [{'id': 1, 'type': 'input'}, {'id': 2, 'type': 'not', 'inputs': 1}]},
+    {'components': [{'id': 1, 'type': 'input', 'delay': {'rise': 3}}]},
+    {'components': [{'id': 1, 'type': 'input', 'delay': -1}]},
+])
+def test_malformed_design_raises_value_error(design_data):
+    with pytest.raises(ValueError):
+        Netlist.from_design_data(design_data)
+
+
+@pytest.mark.parametrize("payload", [
+    {'design_data': {'components': ['x']}},
+    {'design_data': {'delay': {'rise': 3}, 'components': [{'id': 1, 'type': 'not', 'delay': {}}]}},
+    {'design_data': random_design(20, 0), 'simulation_results': ['not', 'a', 'dict']},
+    {'design_data': random_design(20, 0), 'clock_period': 'fast'},
+])
+def test_malformed_designs_still_save(client, payload):
+    response = client.post('/api/circuit-designs', json=payload)
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'success'
+
+
+def test_save_records_timing_error(client):
+    response = client.post('/api/circuit-designs', json={'design_data': {'components': ['x']}})
+    assert 'error' in response.get_json()['circuit']['simulation_results']['timing']
+
+
+def test_update_ignores_client_timing(client):
+    design = random_design(50, 0)
+    circuit = client.post('/api/circuit-designs', json={'design_data': design}).get_json()['circuit']
+    stored = circuit['simulation_results']['timing']
+
+    forged = copy.deepcopy(stored)
+    for gate in forged['gates'].values():
+        gate['arrival'] += 1000
+    revised = copy.deepcopy(design)
+    rewire(revised, random.Random(0))
+    response = client.put('/api/circuit-designs/%d' % circuit['id'], json={
+        'design_data': revised,
+        'simulation_results': {'timing': forged, 'waveform': [1, 0]},
+    })
+    results = response.get_json()['circuit']['simulation_results']
+    assert results['waveform'] == [1, 0]
+    assert_same_timing(results['timing'], analyze_design(revised))
+
+
+def test_update_clock_period_refreshes_slack(client):
+    design = random_design(50, 0)
+    circuit = client.post('/api/circuit-designs', json={
+        'design_data': design, 'clock_period': 500,
+    }).get_json()['circuit']
+    response = client.put('/api/circuit-designs/%d' % circuit['id'], json={'clock_period': 1000})
+    timing = response.get_json()['circuit']['simulation_results']['timing']
+    assert timing['clock_period'] == 1000
+    assert timing['worst_slack'] == pytest.approx(analyze_design(design, clock_period=1000)['worst_slack'])
+
+
+@pytest.mark.parametrize("body", ['null', '[1, 2]', '"name"', 'not json'])
+def test_update_rejects_non_object_body(client, body):
+    circuit = client.post('/api/circuit-designs', json={'design_data': random_design(5, 0)}).get_json()['circuit']
+    response = client.put('/api/circuit-designs/%d' % circuit['id'], data=body, content_type='application/json')
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
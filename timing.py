@@ -0,0 +1,249 @@
+"""Static timing analysis for gate-level circuit designs.
+
+Each gate gets a linear delay model (intrinsic delay plus a load term per
+fan-out, in picoseconds). Arrival times are propagated forward through the
+levelized netlist and the worst downstream delay ("tail") backward, so
+``slack = reference_time - tail - arrival`` where the reference time is the
+clock period, or the critical delay when no period is given.
+
+When a design is revised, :meth:`TimingAnalysis.retime` only revisits gates
+in the fan-out cone (arrival) and fan-in cone (tail) of the edited gates and
+stops wherever the recomputed value is unchanged.
+"""
+import heapq
+
+from netlist import INPUT_TYPES, OUTPUT_TYPES, Netlist
+
+# (intrinsic delay, delay per fan-out load) in picoseconds
+DELAY_MODELS = {
+    'buffer': (12.0, 3.0),
+    'not': (10.0, 3.0),
+    'nand': (14.0, 4.0),
+    'nor': (16.0, 4.0),
+    'and': (20.0, 4.0),
+    'or': (22.0, 4.0),
+    'xor': (30.0, 5.0),
+    'xnor': (30.0, 5.0),
+}
+
+
+def gate_delay(netlist, gate_id):
+    gate = netlist.gates[gate_id]
+    if gate.delay is not None:
+        return gate.delay
+    if gate.type in INPUT_TYPES or gate.type in OUTPUT_TYPES:
+        return 0.0
+    intrinsic, load = DELAY_MODELS[gate.type]
+    return intrinsic + load * len(netlist.fanout[gate_id])
+
+
+class TimingAnalysis:
+    def __init__(self, netlist):
+        self.netlist = netlist
+        self.delay = {}
+        self.level = {}
+        self.arrival = {}
+        self.tail = {}
+        self.retimed = 0
+        self._full_analysis()
+
+    @classmethod
+    def from_report(cls, netlist, report):
+        """Rebuild the analysis of ``netlist`` from a previously stored report."""
+        analysis = cls.__new__(cls)
+        analysis.netlist = netlist
+        analysis.delay = {}
+        analysis.level = {}
+        analysis.arrival = {}
+        analysis.tail = {}
+        analysis.retimed = 0
+        reference = report['reference_time']
+        stored = report['gates']
+        if stored.keys() != netlist.gates.keys():
+            raise ValueError("Stored timing does not match the design")
+        for gate_id, gate_timing in stored.items():
+            analysis.delay[gate_id] = gate_timing['delay']
+            analysis.level[gate_id] = gate_timing['level']
+            analysis.arrival[gate_id] = gate_timing['arrival']
+            analysis.tail[gate_id] = reference - gate_timing['required']
+        return analysis
+
+    def _full_analysis(self):
+        netlist = self.netlist
+        order = netlist.topological_order()
+        for gate_id in order:
+            fanin = netlist.gates[gate_id].fanin
+            self.delay[gate_id] = gate_delay(netlist, gate_id)
+            self.level[gate_id] = 1 + max((self.level[f] for f in fanin), default=-1)
+            self.arrival[gate_id] = max((self.arrival[f] for f in fanin), default=0.0) + self.delay[gate_id]
+        for gate_id in reversed(order):
+            self.tail[gate_id] = self._compute_tail(gate_id)
+        self.retimed = len(order)
+
+    def _compute_tail(self, gate_id):
+        return max((self.delay[s] + self.tail[s] for s in self.netlist.fanout[gate_id]), default=0.0)
+
+    def retime(self, netlist):
+        """Switch to a revised netlist, re-timing only the affected cones."""
+        old = self.netlist
+        changed = set()
+        for gate_id, gate in netlist.gates.items():
+            previous = old.gates.get(gate_id)
+            if (previous is None or previous.type != gate.type
+                    or previous.fanin != gate.fanin or previous.delay != gate.delay):
+                changed.add(gate_id)
+        removed = old.gates.keys() - netlist.gates.keys()
+
+        # Gates whose fan-out changed have a new load delay and a new tail.
+        reloaded = set()
+        for gate_id in changed:
+            reloaded.update(netlist.gates[gate_id].fanin)
+            if gate_id in old.gates:
+                reloaded.update(old.gates[gate_id].fanin)
+        for gate_id in removed:
+            reloaded.update(old.gates[gate_id].fanin)
+            for table in (self.delay, self.level, self.arrival, self.tail):
+                del table[gate_id]
+        reloaded &= netlist.gates.keys()
+
+        self.netlist = netlist
+        for gate_id in changed - old.gates.keys():
+            self.level[gate_id] = 0
+            self.arrival[gate_id] = 0.0
+            self.tail[gate_id] = 0.0
+
+        forward = set(changed)
+        backward = changed | reloaded
+        for gate_id in changed | reloaded:
+            delay = gate_delay(netlist, gate_id)
+            if delay != self.delay.get(gate_id):
+                self.delay[gate_id] = delay
+                forward.add(gate_id)
+                backward.update(netlist.gates[gate_id].fanin)
+
+        touched = set()
+        touched |= self._propagate_arrival(forward)
+        touched |= self._propagate_tail(backward)
+        self.retimed = len(touched)
+        return self.retimed
+
+    def _propagate_arrival(self, seeds):
+        netlist = self.netlist
+        limit = len(netlist.gates)
+        heap = [(self.level[gate_id], gate_id) for gate_id in seeds]
+        heapq.heapify(heap)
+        pending = set(seeds)
+        forced = set(seeds)
+        touched = set()
+        while heap:
+            _, gate_id = heapq.heappop(heap)
+            if gate_id not in pending:
+                continue
+            pending.discard(gate_id)
+            touched.add(gate_id)
+            fanin = netlist.gates[gate_id].fanin
+            level = 1 + max((self.level[f] for f in fanin), default=-1)
+            if level >= limit:
+                raise ValueError("Circuit contains a combinational loop")
+            arrival = max((self.arrival[f] for f in fanin), default=0.0) + self.delay[gate_id]
+            if gate_id in forced or level != self.level[gate_id] or arrival != self.arrival[gate_id]:
+                forced.discard(gate_id)
+                self.level[gate_id] = level
+                self.arrival[gate_id] = arrival
+                for sink in netlist.fanout[gate_id]:
+                    if sink not in pending:
+                        pending.add(sink)
+                        heapq.heappush(heap, (self.level[sink], sink))
+        return touched
+
+    def _propagate_tail(self, seeds):
+        netlist = self.netlist
+        heap = [(-self.level[gate_id], gate_id) for gate_id in seeds]
+        heapq.heapify(heap)
+        pending = set(seeds)
+        forced = set(seeds)
+        touched = set()
+        while heap:
+            _, gate_id = heapq.heappop(heap)
+            if gate_id not in pending:
+                continue
+            pending.discard(gate_id)
+            touched.add(gate_id)
+            tail = self._compute_tail(gate_id)
+            if gate_id in forced or tail != self.tail[gate_id]:
+                forced.discard(gate_id)
+                self.tail[gate_id] = tail
+                for source in netlist.gates[gate_id].fanin:
+                    if source not in pending:
+                        pending.add(source)
+                        heapq.heappush(heap, (-self.level[source], source))
+        return touched
+
+    def endpoints(self):
+        return [gate_id for gate_id, sinks in self.netlist.fanout.items() if not sinks]
+
+    def critical_path(self):
+        endpoints = self.endpoints()
+        if not endpoints:
+            return []
+        gate_id = max(endpoints, key=lambda g: self.arrival[g])
+        path = [gate_id]
+        while self.netlist.gates[gate_id].fanin:
+            gate_id = max(self.netlist.gates[gate_id].fanin, key=lambda g: self.arrival[g])
+            path.append(gate_id)
+        path.reverse()
+        return path
+
+    def report(self, clock_period=None):
+        critical_delay = max((self.arrival[g] for g in self.endpoints()), default=0.0)
+        reference = float(clock_period) if clock_period is not None else critical_delay
+        gates = {}
+        for gate_id, gate in self.netlist.gates.items():
+            required = reference - self.tail[gate_id]
+            gates[gate_id] = {
+                'name': gate.name,
+                'type': gate.type,
+                'delay': self.delay[gate_id],
+                'level': self.level[gate_id],
+                'arrival': self.arrival[gate_id],
+                'required': required,
+                'slack': required - self.arrival[gate_id],
+            }
+        return {
+            'clock_period': clock_period,
+            'reference_time': reference,
+            'critical_delay': critical_delay,
+            'worst_slack': min((g['slack'] for g in gates.values()), default=0.0),
+            'critical_path': self.critical_path(),
+            'retimed_gates': self.retimed,
+            'gates': gates,
+        }
+
+
+def analyze_design(design_data, clock_period=None, previous=None):
+    """Timing report for ``design_data``, or ``None`` if it has no logic gates.
+
+    ``previous`` is an optional ``(old_design_data, old_report)`` pair; when
+    given, the old analysis is restored and re-timed incrementally.
+    """
+    if clock_period is not None and (
+            isinstance(clock_period, bool) or not isinstance(clock_period, (int, float)) or clock_period <= 0):
+        raise ValueError("Clock period must be a positive number")
+    netlist = Netlist.from_design_data(design_data)
+    if not netlist.gate_count():
+        return None
+    analysis = None
+    if previous is not None and previous[1]:
+        old_design_data, old_report = previous
+        try:
+            analysis = TimingAnalysis.from_report(Netlist.from_design_data(old_design_data), old_report)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            analysis = None
+    if analysis is not None:
+        try:
+            analysis.retime(netlist)
+        except ValueError:
+            analysis = None
+    if analysis is None:
+        analysis = TimingAnalysis(netlist)
+    return analysis.report(clock_period)